@@ -4,14 +4,27 @@ JSON Sanitizer Script
 Removes null values, personal sensitive information, and allows manual removal of keys/keywords.
 """
 
+from __future__ import annotations
+
 import json
+import multiprocessing
+import os
 import sys
 import re
-from typing import Dict, List, Any, Set
+from decimal import Decimal
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Set, Tuple
 from pathlib import Path
 
 try:
-    from presidio_analyzer import AnalyzerEngine
+    from presidio_analyzer import (
+        AnalyzerEngine, BatchAnalyzerEngine, Pattern, PatternRecognizer, RecognizerRegistry
+    )
+    from presidio_analyzer.nlp_engine import NlpEngineProvider
+    from presidio_analyzer.predefined_recognizers import (
+        CreditCardRecognizer, EmailRecognizer, IpRecognizer, SpacyRecognizer, UsSsnRecognizer
+    )
     from presidio_anonymizer import AnonymizerEngine
     PRESIDIO_AVAILABLE = True
 except ImportError:
@@ -20,98 +33,380 @@ except ImportError:
     print("Install with: pip install presidio-analyzer presidio-anonymizer")
     print("Falling back to regex-based PII detection.\n")
 
+try:
+    # google-re2 is a linear-time DFA engine with a re-compatible API
+    import re2 as _pii_re
+    RE2_AVAILABLE = True
+except ImportError:
+    _pii_re = re
+    RE2_AVAILABLE = False
+
+try:
+    # pyahocorasick matches many keywords in a single scan of the text
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    # orjson parses and serializes JSON in C
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    # ijson parses a top-level JSON array one item at a time
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    # pyarrow runs a regex over a whole array of strings in one C++ call
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# Regex patterns used for PII detection when Presidio is not available
+_PII_PATTERNS = (
+    # Email
+    (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b', 'EMAIL_ADDRESS'),
+    # Phone numbers (US format)
+    (r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', 'PHONE_NUMBER'),
+    # SSN
+    (r'\b\d{3}-\d{2}-\d{4}\b', 'SSN'),
+    # Credit card (basic pattern)
+    (r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b', 'CREDIT_CARD'),
+    # IP address
+    (r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', 'IP_ADDRESS'),
+)
+
+# All patterns fused into one alternation so each string is scanned once;
+# the name of the matching group is the entity type
+_PII_UNION_PATTERN = '|'.join(f'(?P<{name}>{pattern})' for pattern, name in _PII_PATTERNS)
+_PII_UNION = _pii_re.compile(_PII_UNION_PATTERN)
+# re2 encodes its input as UTF-8, which fails for lone surrogates (valid in JSON
+# strings as escapes like "\ud800"); such text is scanned with the stdlib engine
+_PII_UNION_FALLBACK = re.compile(_PII_UNION_PATTERN)
+
+# Smallest number of strings worth scanning with pyarrow instead of one by one
+_MIN_ARROW_BATCH = 256
+
+# Smallest number of array records worth sanitizing in worker processes, and
+# how many records are sent to a worker at a time
+_MIN_PARALLEL_RECORDS = 10000
+_PARALLEL_CHUNK_SIZE = 256
+
+# Digit runs long enough to overflow a 64-bit integer, which orjson would
+# silently parse as a float
+_LONG_DIGIT_RUN = re.compile(rb'\d{19}')
+
+# Cheap pre-filters for anonymize_text: every structured PII pattern above needs
+# an '@' or a digit and at least 6 characters ('a@b.co'), and NER can only find
+# a person name in text that has a capitalized word. Any word starting with a
+# letter other than a-z counts, so non-ASCII capitals like 'Émile' still pass
+_MIN_PII_LENGTH = 6
+_PII_PREFILTER = re.compile(r'[@\d]')
+_NAME_PREFILTER = re.compile(r'\b[^\W\d_a-z]')
+
+# spaCy model and entities used by Presidio; the small model and a minimal
+# recognizer set cover everything this script redacts
+_SPACY_MODEL = 'en_core_web_sm'
+_PRESIDIO_ENTITIES = ['EMAIL_ADDRESS', 'PHONE_NUMBER', 'US_SSN', 'CREDIT_CARD', 'IP_ADDRESS', 'PERSON']
+
+# Size of the per-sanitizer cache of anonymized strings, and the longest
+# string worth caching
+_ANONYMIZE_CACHE_SIZE = 8192
+_MAX_CACHED_TEXT_LENGTH = 512
+
+# Number of strings handed to spaCy per batch when analyzing with Presidio
+_PRESIDIO_BATCH_SIZE = 64
+
+# Keys whose names suggest sensitive information
+_SENSITIVE_KEYWORDS = (
+    'password', 'passwd', 'secret', 'token', 'api_key',
+    'ssn', 'social_security', 'credit_card', 'card_number',
+    'email', 'phone', 'address', 'name', 'dob', 'birth_date',
+)
+_SENSITIVE_KEY_RE = re.compile('|'.join(map(re.escape, _SENSITIVE_KEYWORDS)), re.IGNORECASE)
+
+
+def _keyword_matcher(keywords: Set[str]) -> Callable[[str], bool]:
+    """Build a case-insensitive check for whether text contains any of the keywords."""
+    lowered = {keyword.lower() for keyword in keywords}
+    
+    if AHOCORASICK_AVAILABLE and lowered and '' not in lowered:
+        automaton = ahocorasick.Automaton()
+        for keyword in lowered:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda text: next(automaton.iter(text.lower()), None) is not None
+    
+    def contains_keyword(text: str) -> bool:
+        text_lower = text.lower()
+        return any(keyword in text_lower for keyword in lowered)
+    return contains_keyword
+
+
+def _per_key_cache(check: Callable[[str], bool]) -> Callable[[str], bool]:
+    """Remember the result of a key check for the keys seen in one traversal.
+    
+    Records usually repeat the same keys, so the regex or keyword search runs
+    once per distinct key instead of once per occurrence.
+    """
+    return lru_cache(maxsize=None)(check)
+
+
+# Returned by _walk visitors to drop a value
+_SKIP = object()
+
+# A _walk stack frame: (iterator over source items, output container, key in parent, root_level)
+_WalkFrame = Tuple[Iterator[Tuple[Any, Any]], Any, Any, bool]
+
 
 class JSONSanitizer:
     """Sanitizes JSON data by removing nulls, PII, and user-specified keys/keywords."""
     
-    def __init__(self):
-        self.analyzer = None
-        self.anonymizer = None
+    def __init__(self) -> None:
+        # Presidio engines, or None when falling back to regex-based detection
+        self.analyzer: Any = None
+        self.anonymizer: Any = None
+        self.batch_analyzer: Any = None
+        # JSON often repeats the same string values; anonymize each only once
+        self._anonymize_cached = lru_cache(maxsize=_ANONYMIZE_CACHE_SIZE)(self._anonymize_uncached)
         if PRESIDIO_AVAILABLE:
             try:
-                self.analyzer = AnalyzerEngine()
+                self.analyzer = self._create_analyzer()
                 self.anonymizer = AnonymizerEngine()
+                self.batch_analyzer = BatchAnalyzerEngine(analyzer_engine=self.analyzer)
             except Exception as e:
                 print(f"Warning: Could not initialize Presidio: {e}")
                 print("Falling back to regex-based PII detection.\n")
     
-    def remove_nulls(self, data: Any, remove_empty_strings: bool = True, remove_empty_arrays: bool = True) -> Any:
-        """Recursively remove all key-value pairs with null values and null items from arrays."""
-        if isinstance(data, dict):
-            result = {}
-            for k, v in data.items():
-                if v is not None:
-                    processed_value = self.remove_nulls(v, remove_empty_strings, remove_empty_arrays)
-                    # Only add if value is not None after processing
-                    if processed_value is not None:
-                        # Skip empty strings if requested
-                        if remove_empty_strings and isinstance(processed_value, str) and processed_value == "":
-                            continue
-                        # Skip empty arrays if requested
-                        if remove_empty_arrays and isinstance(processed_value, list) and len(processed_value) == 0:
-                            continue
-                        result[k] = processed_value
-            return result
-        elif isinstance(data, list):
-            result = []
-            for item in data:
-                if item is not None:
-                    processed_item = self.remove_nulls(item, remove_empty_strings, remove_empty_arrays)
-                    # Only add if item is not None after processing
-                    if processed_item is not None:
-                        # Skip empty strings if requested
-                        if remove_empty_strings and isinstance(processed_item, str) and processed_item == "":
-                            continue
-                        # Skip empty arrays if requested
-                        if remove_empty_arrays and isinstance(processed_item, list) and len(processed_item) == 0:
+    def _create_analyzer(self) -> "AnalyzerEngine":
+        """Create a Presidio analyzer with the small spaCy model and only the needed recognizers."""
+        nlp_engine = NlpEngineProvider(nlp_configuration={
+            'nlp_engine_name': 'spacy',
+            'models': [{'lang_code': 'en', 'model_name': _SPACY_MODEL}],
+        }).create_engine()
+        
+        registry = RecognizerRegistry()
+        registry.add_recognizer(EmailRecognizer())
+        registry.add_recognizer(UsSsnRecognizer())
+        registry.add_recognizer(CreditCardRecognizer())
+        registry.add_recognizer(IpRecognizer())
+        registry.add_recognizer(SpacyRecognizer())
+        # Presidio's PhoneRecognizer tries every country format; US numbers are enough here
+        phone_pattern = next(pattern for pattern, name in _PII_PATTERNS if name == 'PHONE_NUMBER')
+        registry.add_recognizer(PatternRecognizer(
+            supported_entity='PHONE_NUMBER',
+            patterns=[Pattern(name='us_phone', regex=phone_pattern, score=0.5)]
+        ))
+        
+        return AnalyzerEngine(nlp_engine=nlp_engine, registry=registry, supported_languages=['en'])
+    
+    def _walk(self, data: Any, visit: Optional[Callable[[Any, bool], Any]] = None,
+              skip_key: Optional[Callable[[str, bool], bool]] = None) -> Any:
+        """Rebuild nested dicts and lists depth-first using an explicit stack.
+        
+        Args:
+            data: JSON data to process
+            visit: Called as visit(value, in_list) for every child value once it is
+                final (scalars as they are, containers after their children were
+                processed); returns the value to keep, or _SKIP to drop it
+            skip_key: Called as skip_key(key, root_level) for every dict key; the
+                key-value pair is dropped if it returns True. root_level is True for
+                the root dict and dicts reached from it only through lists
+        """
+        if not isinstance(data, (dict, list)):
+            return data
+        
+        result: Any = {} if isinstance(data, dict) else []
+        stack: List[_WalkFrame] = [
+            (iter(data.items()) if isinstance(data, dict) else enumerate(data), result, None, True)
+        ]
+        while stack:
+            items, out, out_key, root_level = stack[-1]
+            in_list = isinstance(out, list)
+            for k, v in items:
+                if skip_key is not None and not in_list and skip_key(k, root_level):
+                    continue
+                # Descend into containers; this frame resumes once the child is done
+                if isinstance(v, dict):
+                    stack.append((iter(v.items()), {}, k, root_level and in_list))
+                    break
+                if isinstance(v, list):
+                    stack.append((enumerate(v), [], k, root_level and in_list))
+                    break
+                if visit is not None:
+                    v = visit(v, in_list)
+                    if v is _SKIP:
+                        continue
+                if in_list:
+                    out.append(v)
+                else:
+                    out[k] = v
+            else:
+                # All items processed: attach the finished container to its parent
+                stack.pop()
+                if stack:
+                    parent = stack[-1][1]
+                    in_list = isinstance(parent, list)
+                    if visit is not None:
+                        out = visit(out, in_list)
+                        if out is _SKIP:
                             continue
-                        result.append(processed_item)
-            return result
-        else:
+                    if in_list:
+                        parent.append(out)
+                    else:
+                        parent[out_key] = out
+        return result
+    
+    def remove_nulls(self, data: Any, remove_empty_strings: bool = True, remove_empty_arrays: bool = True) -> Any:
+        """Remove all key-value pairs with null values and null items from arrays."""
+        if not isinstance(data, (dict, list)):
             return data
+        
+        # Same explicit-stack traversal as _walk, with the checks inlined since this
+        # runs over every value of the input
+        result: Any = {} if isinstance(data, dict) else []
+        # Each frame: (iterator over source items, output container, key in parent)
+        stack: List[Tuple[Iterator[Tuple[Any, Any]], Any, Any]] = [
+            (iter(data.items()) if isinstance(data, dict) else enumerate(data), result, None)
+        ]
+        while stack:
+            items, out, out_key = stack[-1]
+            in_list = isinstance(out, list)
+            for k, v in items:
+                if v is None:
+                    continue
+                # Exact str check first: most values are plain strings
+                if type(v) is str:
+                    # Skip empty strings if requested
+                    if not v and remove_empty_strings:
+                        continue
+                elif isinstance(v, dict):
+                    stack.append((iter(v.items()), {}, k))
+                    break
+                elif isinstance(v, list):
+                    stack.append((enumerate(v), [], k))
+                    break
+                if in_list:
+                    out.append(v)
+                else:
+                    out[k] = v
+            else:
+                # All items processed: attach the finished container to its parent
+                stack.pop()
+                if not stack:
+                    break
+                # Skip empty arrays if requested
+                if remove_empty_arrays and in_list and not out:
+                    continue
+                parent = stack[-1][1]
+                if isinstance(parent, list):
+                    parent.append(out)
+                else:
+                    parent[out_key] = out
+        return result
     
     def detect_pii_regex(self, text: str) -> List[Dict[str, Any]]:
         """Detect PII using regex patterns when Presidio is not available."""
-        patterns = [
-            # Email
-            (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 'EMAIL_ADDRESS'),
-            # Phone numbers (US format)
-            (r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', 'PHONE_NUMBER'),
-            # SSN
-            (r'\b\d{3}-\d{2}-\d{4}\b', 'SSN'),
-            # Credit card (basic pattern)
-            (r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b', 'CREDIT_CARD'),
-            # IP address
-            (r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', 'IP_ADDRESS'),
-        ]
+        try:
+            matches = list(_PII_UNION.finditer(text))
+        except UnicodeEncodeError:
+            matches = list(_PII_UNION_FALLBACK.finditer(text))
         
         entities = []
-        for pattern, entity_type in patterns:
-            for match in re.finditer(pattern, text):
-                entities.append({
-                    'entity_type': entity_type,
-                    'start': match.start(),
-                    'end': match.end(),
-                    'score': 0.9
-                })
+        for match in matches:
+            entities.append({
+                'entity_type': match.lastgroup,
+                'start': match.start(),
+                'end': match.end(),
+                'score': 0.9
+            })
         return entities
     
+    def _may_contain_pii(self, text: str) -> bool:
+        """Cheap check whether text can contain anything the PII detectors look for."""
+        if len(text) >= _MIN_PII_LENGTH and _PII_PREFILTER.search(text):
+            return True
+        return bool(self.analyzer and self.anonymizer and _NAME_PREFILTER.search(text))
+    
     def anonymize_text(self, text: str) -> str:
         """Anonymize sensitive information in text."""
         if not text or not isinstance(text, str):
             return text
         
+        # Skip strings that cannot contain anything the detectors look for
+        if not self._may_contain_pii(text):
+            return text
+        
+        if len(text) > _MAX_CACHED_TEXT_LENGTH:
+            return self._anonymize_uncached(text)
+        return self._anonymize_cached(text)
+    
+    def _anonymize_uncached(self, text: str) -> str:
+        """Anonymize text that passed the pre-filter, without consulting the cache."""
+        results = None
         if self.analyzer and self.anonymizer:
             try:
                 # Detect PII using Presidio
-                results = self.analyzer.analyze(text=text, language='en')
-                if results:
-                    # Anonymize the detected entities
-                    anonymized = self.anonymizer.anonymize(
-                        text=text,
-                        analyzer_results=results
-                    )
-                    return anonymized.text
+                results = self.analyzer.analyze(text=text, language='en', entities=_PRESIDIO_ENTITIES)
+            except Exception as e:
+                print(f"Warning: Presidio error: {e}, using regex fallback")
+        
+        return self._anonymize_with_results(text, results)
+    
+    def anonymize_texts(self, texts: List[str]) -> List[str]:
+        """Anonymize a list of strings, analyzing them with Presidio in batches."""
+        if not (self.batch_analyzer and self.anonymizer):
+            # Arrow matches with RE2, so its results only agree with
+            # detect_pii_regex when that uses RE2 too
+            if PYARROW_AVAILABLE and RE2_AVAILABLE and len(texts) >= _MIN_ARROW_BATCH:
+                try:
+                    array = pa.array(texts, type=pa.string())
+                except UnicodeEncodeError:
+                    # Lone surrogates cannot be encoded to UTF-8
+                    return [self.anonymize_text(text) for text in texts]
+                # Find the strings with a PII match in one vectorized pass
+                hits = pc.match_substring_regex(array, _PII_UNION_PATTERN).to_pylist()
+                return [self.anonymize_text(text) if hit else text for text, hit in zip(texts, hits)]
+            return [self.anonymize_text(text) for text in texts]
+        
+        # Only distinct strings passing the pre-filter are sent to the NLP pipeline
+        candidates = list(dict.fromkeys(text for text in texts if self._may_contain_pii(text)))
+        try:
+            batch_results = self.batch_analyzer.analyze_iterator(
+                candidates,
+                language='en',
+                batch_size=_PRESIDIO_BATCH_SIZE,
+                entities=_PRESIDIO_ENTITIES
+            )
+        except Exception as e:
+            print(f"Warning: Presidio error: {e}, using regex fallback")
+            batch_results = [None] * len(candidates)
+        
+        anonymized = {
+            text: self._anonymize_with_results(text, results)
+            for text, results in zip(candidates, batch_results)
+        }
+        return [anonymized.get(text, text) for text in texts]
+    
+    def _anonymize_with_results(self, text: str, results: Any) -> str:
+        """Anonymize text using Presidio analyzer results, or regex if there are none."""
+        if results:
+            try:
+                # Anonymize the detected entities
+                anonymized = self.anonymizer.anonymize(
+                    text=text,
+                    analyzer_results=results
+                )
+                return anonymized.text
             except Exception as e:
                 print(f"Warning: Presidio error: {e}, using regex fallback")
         
@@ -133,98 +428,96 @@ class JSONSanitizer:
         return text
     
     def remove_sensitive_info(self, data: Any) -> Any:
-        """Recursively remove sensitive information from JSON data."""
-        if isinstance(data, dict):
-            result = {}
-            for k, v in data.items():
-                # Check if key suggests sensitive information
-                sensitive_keywords = ['password', 'passwd', 'secret', 'token', 'api_key', 
-                                    'ssn', 'social_security', 'credit_card', 'card_number',
-                                    'email', 'phone', 'address', 'name', 'dob', 'birth_date']
-                key_lower = k.lower()
-                
-                if any(keyword in key_lower for keyword in sensitive_keywords):
-                    # Remove the entire key-value pair
-                    continue
-                
-                # Recursively process value
-                result[k] = self.remove_sensitive_info(v)
-            
-            # Also anonymize string values
-            for k, v in result.items():
+        """Remove sensitive information from JSON data.
+        
+        Keys suggesting sensitive information are dropped first; the remaining
+        string values are then anonymized together so Presidio can batch them.
+        """
+        return self._anonymize_strings(self._remove_sensitive_keys(data))
+    
+    def _remove_sensitive_keys(self, data: Any) -> Any:
+        """Remove key-value pairs whose key suggests sensitive information."""
+        def sensitive(key: str) -> bool:
+            return _SENSITIVE_KEY_RE.search(key) is not None
+        
+        is_sensitive = _per_key_cache(sensitive)
+        
+        return self._walk(data, skip_key=lambda key, root_level: is_sensitive(key))
+    
+    def _anonymize_strings(self, data: Any) -> Any:
+        """Anonymize all string values of freshly built JSON data in place.
+        
+        Returns data itself, or the anonymized string if data is a string.
+        """
+        # Collect (container, key) for every string leaf, then write back
+        root = [data]
+        slots = []
+        stack: List[Any] = [root]
+        while stack:
+            node = stack.pop()
+            for k, v in (node.items() if isinstance(node, dict) else enumerate(node)):
                 if isinstance(v, str):
-                    result[k] = self.anonymize_text(v)
-            
-            return result
-        elif isinstance(data, list):
-            return [self.remove_sensitive_info(item) for item in data]
-        elif isinstance(data, str):
-            return self.anonymize_text(data)
-        else:
-            return data
+                    slots.append((node, k))
+                elif isinstance(v, (dict, list)):
+                    stack.append(v)
+        
+        anonymized = self.anonymize_texts([node[k] for node, k in slots])
+        for (node, k), text in zip(slots, anonymized):
+            node[k] = text
+        return root[0]
     
     def remove_keywords(self, data: Any, keywords: Set[str]) -> Any:
         """Remove entries containing specified keywords in keys or values."""
-        if isinstance(data, dict):
-            result = {}
-            for k, v in data.items():
-                # Check if key contains any keyword
-                if any(keyword.lower() in k.lower() for keyword in keywords):
-                    continue
-                
-                # Process value
-                processed_value = self.remove_keywords(v, keywords)
-                
-                # Check if value contains keyword (for strings)
-                if isinstance(processed_value, str):
-                    if any(keyword.lower() in processed_value.lower() for keyword in keywords):
-                        continue
-                
-                result[k] = processed_value
-            return result
-        elif isinstance(data, list):
-            return [self.remove_keywords(item, keywords) for item in data if item is not None]
-        elif isinstance(data, str):
-            # Check if string contains keyword
-            if any(keyword.lower() in data.lower() for keyword in keywords):
+        contains_keyword = _keyword_matcher(keywords)
+        
+        def visit(value: Any, in_list: bool) -> Any:
+            # Null items are dropped from arrays
+            if in_list and value is None:
+                return _SKIP
+            # Strings containing a keyword become null
+            if isinstance(value, str) and contains_keyword(value):
                 return None
-            return data
-        else:
-            return data
+            return value
+        
+        key_has_keyword = _per_key_cache(contains_keyword)
+        
+        def skip_key(key: str, root_level: bool) -> bool:
+            return key_has_keyword(key)
+        
+        if isinstance(data, str):
+            return None if contains_keyword(data) else data
+        return self._walk(data, visit, skip_key)
     
     def remove_keys(self, data: Any, keys_to_remove: Set[str], root_level: bool = True) -> Any:
         """Remove specified keys from JSON objects.
         
+        Nested values below the root level are returned as they are, not copied.
+        
         Args:
             data: JSON data to process
             keys_to_remove: Set of keys to remove
             root_level: If True, only remove keys at root level (not nested)
         """
+        if not root_level:
+            # Keys are never removed below the root level
+            return data
         if isinstance(data, dict):
-            if root_level:
-                # Only remove keys at the current (root) level
-                return {
-                    k: self.remove_keys(v, keys_to_remove, root_level=False)
-                    for k, v in data.items()
-                    if k not in keys_to_remove
-                }
-            else:
-                # Recursively process nested structures without removing keys
-                return {
-                    k: self.remove_keys(v, keys_to_remove, root_level=False)
-                    for k, v in data.items()
-                }
+            return {k: v for k, v in data.items() if k not in keys_to_remove}
         elif isinstance(data, list):
-            # When at root level, each item in the list should also have root-level keys removed
-            # When not at root level, process nested items without removing keys
-            return [self.remove_keys(item, keys_to_remove, root_level=root_level) for item in data]
+            # Each item in a root-level list should also have root-level keys removed
+            return [self.remove_keys(item, keys_to_remove, root_level=True) for item in data]
         else:
             return data
     
     def sanitize(self, data: Any, remove_nulls: bool = True, 
-                 remove_pii: bool = True, keywords: Set[str] = None, 
-                 keys_to_remove: Set[str] = None) -> Any:
+                 remove_pii: bool = True, keywords: Optional[Set[str]] = None, 
+                 keys_to_remove: Optional[Set[str]] = None) -> Any:
         """Apply all sanitization steps."""
+        # Combine several steps into a single traversal of the data
+        steps = (remove_nulls, remove_pii, bool(keywords), bool(keys_to_remove))
+        if isinstance(data, (dict, list)) and sum(steps) > 1:
+            return self._sanitize_walk(data, remove_pii, keywords, keys_to_remove)
+        
         result = data
         
         if remove_nulls:
@@ -244,11 +537,65 @@ class JSONSanitizer:
             result = self.remove_nulls(result)
         
         return result
+    
+    def _sanitize_walk(self, data: Any, remove_pii: bool, keywords: Optional[Set[str]],
+                       keys_to_remove: Optional[Set[str]]) -> Any:
+        """Apply several sanitization steps to a dict or list in one traversal.
+        
+        Gives the same result as running the steps one after another. Whenever
+        more than one step is enabled, nulls, empty strings and empty arrays end
+        up removed, so they are always pruned here.
+        """
+        # Keyword matching has to see anonymized text, so strings are anonymized
+        # during the walk when keywords are given and in one batch afterwards otherwise
+        anonymize_inline = remove_pii and bool(keywords)
+        
+        contains_keyword = _keyword_matcher(keywords or set())
+        
+        def visit(value: Any, in_list: bool) -> Any:
+            if value is None:
+                return _SKIP
+            if isinstance(value, str):
+                if anonymize_inline:
+                    value = self.anonymize_text(value)
+                if value == "" or (keywords and contains_keyword(value)):
+                    return _SKIP
+            elif isinstance(value, list) and len(value) == 0:
+                return _SKIP
+            return value
+        
+        def unwanted_key(key: str) -> bool:
+            if remove_pii and _SENSITIVE_KEY_RE.search(key):
+                return True
+            return bool(keywords) and contains_keyword(key)
+        
+        is_unwanted_key = _per_key_cache(unwanted_key)
+        
+        def skip_key(key: str, root_level: bool) -> bool:
+            if keys_to_remove and root_level and key in keys_to_remove:
+                return True
+            return is_unwanted_key(key)
+        
+        result = self._walk(data, visit, skip_key)
+        if remove_pii and not anonymize_inline:
+            result = self._anonymize_strings(result)
+        return result
 
 
 def load_json_file(filepath: str) -> Any:
     """Load JSON from file."""
     try:
+        if ORJSON_AVAILABLE:
+            with open(filepath, 'rb') as f:
+                raw = f.read()
+            # orjson turns integers outside 64 bits into floats and rejects
+            # NaN, Infinity and out-of-range floats; leave those to json
+            if not _LONG_DIGIT_RUN.search(raw):
+                try:
+                    return orjson.loads(raw)
+                except orjson.JSONDecodeError:
+                    pass
+            return json.loads(raw.decode('utf-8'))
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
     except FileNotFoundError:
@@ -259,67 +606,218 @@ def load_json_file(filepath: str) -> Any:
         sys.exit(1)
 
 
+def is_json_array(filepath: str) -> bool:
+    """Check whether the top-level value of a JSON file is an array."""
+    try:
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(4096), b''):
+                chunk = chunk.lstrip()
+                if chunk:
+                    return chunk.startswith(b'[')
+    except OSError:
+        pass
+    return False
+
+
+def _decimals_to_floats(value: Any) -> Any:
+    """Replace the Decimal numbers ijson yields with floats, in place, as json.load would parse them."""
+    if isinstance(value, Decimal):
+        return float(value)
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            items: Iterable[Tuple[Any, Any]] = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        else:
+            continue
+        for k, v in items:
+            if isinstance(v, Decimal):
+                node[k] = float(v)
+            elif isinstance(v, (dict, list)):
+                stack.append(v)
+    return value
+
+
+def iter_json_array(filepath: str) -> Iterator[Any]:
+    """Stream the records of a top-level JSON array, keeping one in memory at a time.
+    
+    Raises ijson.JSONError when the file is not valid JSON. The error is
+    raised rather than exiting here, so that it also reaches the consumer
+    when records are read by the task feeder of a multiprocessing pool.
+    """
+    with open(filepath, 'rb') as f:
+        # Not use_float=True: yajl2_c then fails on integers beyond 64 bits
+        for record in ijson.items(f, 'item'):
+            yield _decimals_to_floats(record)
+
+
+# Sanitizer and sanitize() options of a worker process, set up by _init_worker
+_worker_sanitizer: Optional[JSONSanitizer] = None
+_worker_options: Dict[str, Any] = {}
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    """Create the sanitizer of a worker process once, so Presidio loads once per worker."""
+    global _worker_sanitizer, _worker_options
+    _worker_sanitizer = JSONSanitizer()
+    _worker_options = options
+
+
+def _sanitize_one(record: Any) -> Any:
+    """Sanitize one array record in a worker process."""
+    assert _worker_sanitizer is not None, "worker not initialized"
+    return _worker_sanitizer.sanitize(record, **_worker_options)
+
+
+def sanitize_records(records: Iterable[Any], sanitizer: JSONSanitizer, processes: int = 1,
+                     **options: Any) -> Iterator[Any]:
+    """Sanitize the records of a JSON array, yielding the results in order.
+    
+    Records that end up null, an empty string or an empty array are skipped,
+    as remove_nulls would do for the array.
+    
+    Args:
+        records: Records of a JSON array
+        sanitizer: Sanitizer applied to every record in this process
+        processes: Number of worker processes to use when PII is removed and
+            there are at least _MIN_PARALLEL_RECORDS records; each worker
+            creates its own sanitizer
+        **options: Keyword arguments passed on to JSONSanitizer.sanitize
+    """
+    records = iter(records)
+    head = list(islice(records, _MIN_PARALLEL_RECORDS))
+    
+    # Without PII detection a record takes about as long to sanitize as to
+    # pickle to a worker and back, so only Presidio work is worth sending out
+    parallel = processes > 1 and options.get('remove_pii', True)
+    if parallel and len(head) == _MIN_PARALLEL_RECORDS:
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(options,)) as pool:
+            results = pool.imap(_sanitize_one, chain(head, records), chunksize=_PARALLEL_CHUNK_SIZE)
+            for result in results:
+                if result is None or result == "" or result == []:
+                    continue
+                yield result
+    else:
+        for record in chain(head, records):
+            result = sanitizer.sanitize(record, **options)
+            if result is None or result == "" or result == []:
+                continue
+            yield result
+
+
+def load_and_sanitize_stream(filepath: str, sanitizer: JSONSanitizer, processes: int = 1,
+                             **options: Any) -> Iterator[Any]:
+    """Stream the records of a top-level JSON array and yield each one sanitized.
+    
+    Args:
+        filepath: Path of a JSON file whose top-level value is an array
+        sanitizer: Sanitizer applied to every record
+        processes: Number of worker processes for large arrays
+        **options: Keyword arguments passed on to JSONSanitizer.sanitize
+    """
+    yield from sanitize_records(iter_json_array(filepath), sanitizer, processes, **options)
+
+
+def is_json_safe(data: Any) -> bool:
+    """Check that data only consists of JSON types, without serializing it."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if not all(isinstance(k, str) for k in value):
+                return False
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+        elif not (value is None or isinstance(value, (str, int, float))):
+            return False
+    return True
+
+
+def _render_value(key: str, value: Any, lines: List[str]) -> None:
+    """Append the Markdown lines for one key-value pair of a record."""
+    if isinstance(value, list):
+        if value:  # Only add if list is not empty
+            items_str = ", ".join([sv for v in value if v is not None and (sv := str(v)).strip()])
+            if items_str:
+                lines.append(f"- **{key}**: {items_str}")
+    elif isinstance(value, dict):
+        lines.append(f"- **{key}**:")
+        lines.extend([f"  - {k}: {v}" for k, v in value.items()])
+    elif value is not None and str(value).strip():
+        lines.append(f"- **{key}**: {value}")
+
+
+def markdown_records(records: Iterable[Any]) -> Iterator[str]:
+    """Convert the records of a JSON array to Markdown, one block per object."""
+    for i, item in enumerate(records):
+        if isinstance(item, dict):
+            lines = [f"\n## Record {i + 1}\n"]
+            
+            # Create a table for key-value pairs
+            for key, value in item.items():
+                _render_value(key, value, lines)
+            lines.append("")  # Empty line between records
+            yield "\n".join(lines)
+
+
 def json_to_markdown(data: Any) -> str:
     """Convert JSON data to Markdown format."""
-    lines = []
+    lines: List[str] = []
     
     if isinstance(data, list):
-        for i, item in enumerate(data):
-            if isinstance(item, dict):
-                lines.append(f"\n## Record {i + 1}\n")
-                
-                # Create a table for key-value pairs
-                for key, value in item.items():
-                    if isinstance(value, list):
-                        if value:  # Only add if list is not empty
-                            items_str = ", ".join(str(v) for v in value if v is not None and str(v).strip())
-                            if items_str:
-                                lines.append(f"- **{key}**: {items_str}")
-                    elif isinstance(value, dict):
-                        lines.append(f"- **{key}**:")
-                        for k, v in value.items():
-                            lines.append(f"  - {k}: {v}")
-                    else:
-                        if value is not None and str(value).strip():
-                            lines.append(f"- **{key}**: {value}")
-                lines.append("")  # Empty line between records
+        lines.extend(markdown_records(data))
     elif isinstance(data, dict):
         lines.append("## Record\n")
         for key, value in data.items():
-            if isinstance(value, list):
-                if value:
-                    items_str = ", ".join(str(v) for v in value if v is not None and str(v).strip())
-                    if items_str:
-                        lines.append(f"- **{key}**: {items_str}")
-            elif isinstance(value, dict):
-                lines.append(f"- **{key}**:")
-                for k, v in value.items():
-                    lines.append(f"  - {k}: {v}")
-            else:
-                if value is not None and str(value).strip():
-                    lines.append(f"- **{key}**: {value}")
+            _render_value(key, value, lines)
     else:
         lines.append(str(data))
     
     return "\n".join(lines)
 
 
-def save_plain_text_file(data: Any, filepath: str):
-    """Save JSON data as Markdown file."""
+def save_plain_text_file(data: Any, filepath: str) -> None:
+    """Save JSON data as Markdown file.
+    
+    data may also be an iterator of array records, which are converted and
+    written one at a time. An ijson.JSONError raised while reading them is
+    passed on to the caller, and no output file is left behind.
+    """
     try:
-        # Convert to markdown format
-        markdown_content = json_to_markdown(data)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        if isinstance(data, Iterator):
+            size = 0
+            try:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    for i, block in enumerate(markdown_records(data)):
+                        if i:
+                            size += f.write("\n")
+                        size += f.write(block)
+            except BaseException:
+                # Don't leave a partial file behind when reading a record fails
+                Path(filepath).unlink(missing_ok=True)
+                raise
+        else:
+            # Convert to markdown format
+            markdown_content = json_to_markdown(data)
+            
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(markdown_content)
+            size = len(markdown_content)
         print(f"✓ Results saved to '{filepath}'")
-        print(f"✓ Markdown file created (size: {len(markdown_content)} characters)")
+        print(f"✓ Markdown file created (size: {size} characters)")
     except Exception as e:
+        if IJSON_AVAILABLE and isinstance(e, ijson.JSONError):
+            # Raised by iter_json_array while streaming the records; the caller
+            # decides whether to load the file another way
+            raise
         print(f"Error saving file: {e}")
         sys.exit(1)
 
 
-def main():
+def main() -> None:
     """Main function to run the JSON sanitizer."""
     if len(sys.argv) < 2:
         print("Usage: python3 json_sanitizer.py <input_json_file>")
@@ -334,34 +832,53 @@ def main():
     output_file = input_path.stem + "_sanitized.md"
     
     print(f"Loading JSON from '{input_file}'...")
-    data = load_json_file(input_file)
+    # A top-level array is streamed and sanitized record by record while saving
+    stream = IJSON_AVAILABLE and is_json_array(input_file)
+    data = None if stream else load_json_file(input_file)
     
     sanitizer = JSONSanitizer()
+    # Large arrays are sanitized in one worker process per CPU when PII is removed
+    processes = os.cpu_count() or 1
     
     # Automatically remove nulls, empty strings, and empty arrays (for Neo4j compatibility)
     print("Removing null values, empty strings, and empty arrays...")
-    data = sanitizer.remove_nulls(data, remove_empty_strings=True, remove_empty_arrays=True)
-    
     # Automatically remove specified keys: email, mobileNumber, bloodGroup, created, lastModified
     keys_to_remove = {'email', 'mobileNumber', 'bloodGroup', 'created', 'lastModified'}
     print(f"Removing root-level keys: {', '.join(sorted(keys_to_remove))}...")
-    data = sanitizer.remove_keys(data, keys_to_remove, root_level=True)
-    
-    # Remove nulls again after key removal
-    data = sanitizer.remove_nulls(data, remove_empty_strings=True, remove_empty_arrays=True)
     
-    # Validate JSON structure
-    print("Validating JSON structure...")
-    try:
-        json_str = json.dumps(data, indent=2, ensure_ascii=False)
-        json.loads(json_str)  # Verify it can be parsed
-        print(f"✓ JSON is valid (size: {len(json_str)} characters)")
-    except Exception as e:
-        print(f"⚠ Warning: JSON validation issue: {e}")
+    if stream:
+        print(f"Saving results to '{output_file}'...")
+        records = load_and_sanitize_stream(input_file, sanitizer, processes,
+                                           remove_pii=False, keys_to_remove=keys_to_remove)
+        try:
+            save_plain_text_file(records, output_file)
+        except ijson.JSONError:
+            # ijson rejects NaN and Infinity, which json accepts; load the whole
+            # file instead, which also reports really invalid JSON
+            print("Could not stream the file, loading it in full...")
+            data = load_json_file(input_file)
+            stream = False
     
-    # Save as plain text
-    print(f"Saving results to '{output_file}'...")
-    save_plain_text_file(data, output_file)
+    if not stream:
+        if isinstance(data, list):
+            data = list(sanitize_records(data, sanitizer, processes,
+                                         remove_pii=False, keys_to_remove=keys_to_remove))
+        else:
+            data = sanitizer.remove_nulls(data, remove_empty_strings=True, remove_empty_arrays=True)
+            data = sanitizer.remove_keys(data, keys_to_remove, root_level=True)
+            # Remove nulls again after key removal
+            data = sanitizer.remove_nulls(data, remove_empty_strings=True, remove_empty_arrays=True)
+        
+        # Validate JSON structure
+        print("Validating JSON structure...")
+        if is_json_safe(data):
+            print("✓ JSON is valid")
+        else:
+            print("⚠ Warning: JSON validation issue: data contains values that are not JSON types")
+        
+        # Save as plain text
+        print(f"Saving results to '{output_file}'...")
+        save_plain_text_file(data, output_file)
     
     print("\n✓ Sanitization complete!")
     print(f"Final output saved to '{output_file}'")
@@ -0,0 +1,32 @@
+"""
+Build script for the JSON Sanitizer.
+
+When mypy is installed, json_sanitizer.py is compiled to a C extension with mypyc:
+    pip3 install mypy wheel
+    pip3 install --no-build-isolation .
+The compiled module is used by the json-sanitizer command and by imports,
+not by running json_sanitizer.py as a script. Without mypy the module is
+installed as plain Python.
+"""
+
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+    # Optional dependencies (Presidio, re2, ijson, ...) ship without type stubs
+    ext_modules = mypycify(['--ignore-missing-imports', 'json_sanitizer.py'])
+except ImportError:
+    ext_modules = []
+
+with open('requirements.txt', encoding='utf-8') as f:
+    install_requires = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+setup(
+    name='json-sanitizer',
+    version='1.0.0',
+    description='Removes null values, personal sensitive information, and user-specified keys/keywords from JSON.',
+    py_modules=['json_sanitizer'],
+    ext_modules=ext_modules,
+    install_requires=install_requires,
+    entry_points={'console_scripts': ['json-sanitizer=json_sanitizer:main']},
+)
@@ -0,0 +1,263 @@
+import contextlib
+import copy
+import io
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import json_sanitizer
+from json_sanitizer import (
+    IJSON_AVAILABLE, JSONSanitizer, _MIN_PARALLEL_RECORDS, is_json_safe, json_to_markdown,
+    load_and_sanitize_stream, load_json_file, markdown_records, sanitize_records,
+    save_plain_text_file
+)
+
+STRINGS = [
+    'hello', 'Contact me at john.doe@example.com now', 'call 555-123-4567', 'ssn 123-45-6789',
+    'card 4111 1111 1111 1111', 'ip 192.168.1.10', '', 'internal note', 'DEBUG mode', 'Bob Smith',
+]
+KEYS = ['id', 'title', 'password', 'Email', 'email', 'created', 'meta', 'internal_id', 'tags', 'notes']
+
+
+def make_sanitizer():
+    """Create a sanitizer without printing the Presidio status."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return JSONSanitizer()
+
+
+def random_json(rng, depth=0):
+    """Build a random JSON value with nulls, empty values, PII and sensitive keys."""
+    r = rng.random()
+    if depth > 4 or r < 0.35:
+        return rng.choice([None, 0, 1, 2.5, True, False] + STRINGS)
+    if r < 0.65:
+        return [random_json(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return {rng.choice(KEYS): random_json(rng, depth + 1) for _ in range(rng.randint(0, 5))}
+
+
+def sanitize_sequentially(sanitizer, data, remove_nulls, remove_pii, keywords, keys_to_remove):
+    """Run the sanitize() steps one after another, without the combined traversal."""
+    if remove_nulls:
+        data = sanitizer.remove_nulls(data)
+    if remove_pii:
+        data = sanitizer.remove_sensitive_info(data)
+    if keywords:
+        data = sanitizer.remove_nulls(sanitizer.remove_keywords(data, keywords))
+    if keys_to_remove:
+        data = sanitizer.remove_nulls(sanitizer.remove_keys(data, keys_to_remove, root_level=True))
+    return data
+
+
+def nested(depth):
+    """Build {'a': [child, None, ''], 'b': 'x'} nested depth levels deep."""
+    data = {'b': 'x'}
+    for _ in range(depth):
+        data = {'a': [data, None, ''], 'b': 'x'}
+    return data
+
+
+def nesting_depth(data):
+    """Follow the first 'a' item down and count the levels."""
+    depth = 0
+    while 'a' in data:
+        data = data['a'][0]
+        depth += 1
+    return depth
+
+
+def run_main(directory, filename):
+    """Run the script on a file in directory and return its exit code and output."""
+    output = io.StringIO()
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        with mock.patch.object(sys, 'argv', ['json_sanitizer.py', filename]), \
+                contextlib.redirect_stdout(output):
+            try:
+                json_sanitizer.main()
+                code = 0
+            except SystemExit as e:
+                code = e.code
+    finally:
+        os.chdir(cwd)
+    return code, output.getvalue()
+
+
+@unittest.skipUnless(IJSON_AVAILABLE, "ijson is not installed")
+class TruncatedStreamTest(unittest.TestCase):
+    def test_truncated_array_with_workers_raises(self):
+        import ijson
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            input_file = os.path.join(tmp, 'input.json')
+            output_file = os.path.join(tmp, 'input_sanitized.md')
+            records = [{'id': i, 'name': f'record {i}'} for i in range(_MIN_PARALLEL_RECORDS + 1000)]
+            with open(input_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(records)[:-20])
+            
+            errors = []
+            
+            def run():
+                stream = load_and_sanitize_stream(input_file, make_sanitizer(), 2, remove_pii=True)
+                try:
+                    save_plain_text_file(stream, output_file)
+                except Exception as e:
+                    errors.append(e)
+            
+            with contextlib.redirect_stdout(io.StringIO()):
+                thread = threading.Thread(target=run, daemon=True)
+                thread.start()
+                thread.join(timeout=120)
+            
+            self.assertFalse(thread.is_alive(), "sanitizing a truncated stream hung")
+            self.assertEqual(len(errors), 1)
+            self.assertIsInstance(errors[0], ijson.JSONError)
+            self.assertFalse(os.path.exists(output_file))
+    
+    def test_truncated_array_exits(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'input.json'), 'w', encoding='utf-8') as f:
+                f.write('[{"a": 1}, {"b": ')
+            
+            code, output = run_main(tmp, 'input.json')
+            
+            self.assertEqual(code, 1)
+            self.assertIn("Error: Invalid JSON in file", output)
+            self.assertFalse(os.path.exists(os.path.join(tmp, 'input_sanitized.md')))
+
+
+class SanitizeTest(unittest.TestCase):
+    def test_combined_traversal_matches_sequential_steps(self):
+        sanitizer = make_sanitizer()
+        rng = random.Random(0)
+        documents = [random_json(rng) for _ in range(300)]
+        
+        for flags in itertools.product([False, True], [False, True], [None, {'debug', 'internal'}],
+                                       [None, {'created', 'email'}]):
+            for data in documents:
+                expected = sanitize_sequentially(sanitizer, copy.deepcopy(data), *flags)
+                result = sanitizer.sanitize(copy.deepcopy(data), *flags)
+                self.assertEqual(result, expected, (flags, data))
+    
+    def test_remove_nulls(self):
+        sanitizer = make_sanitizer()
+        data = {'a': None, 'b': '', 'c': [], 'd': [None, '', [], 0, False, 'x'], 'e': {'f': None}, 'g': 1.5}
+        
+        self.assertEqual(sanitizer.remove_nulls(data), {'d': [0, False, 'x'], 'e': {}, 'g': 1.5})
+        self.assertEqual(sanitizer.remove_nulls(data, remove_empty_strings=False, remove_empty_arrays=False),
+                         {'b': '', 'c': [], 'd': ['', [], 0, False, 'x'], 'e': {}, 'g': 1.5})
+        self.assertEqual(data['d'], [None, '', [], 0, False, 'x'])
+    
+    def test_remove_keys_only_at_root_level(self):
+        sanitizer = make_sanitizer()
+        data = [{'email': 'x', 'id': 1, 'meta': {'email': 'y'}}, [{'email': 'z'}], 'text']
+        
+        result = sanitizer.remove_keys(data, {'email'})
+        
+        self.assertEqual(result, [{'id': 1, 'meta': {'email': 'y'}}, [{}], 'text'])
+        self.assertEqual(data[0], {'email': 'x', 'id': 1, 'meta': {'email': 'y'}})
+    
+    def test_nesting_deeper_than_recursion_limit(self):
+        sanitizer = make_sanitizer()
+        depth = sys.getrecursionlimit() * 2
+        
+        self.assertEqual(nesting_depth(sanitizer.remove_nulls(nested(depth))), depth)
+        self.assertEqual(nesting_depth(sanitizer.remove_keywords(nested(depth), {'debug'})), depth)
+        self.assertEqual(nesting_depth(sanitizer.remove_sensitive_info(nested(depth))), depth)
+        self.assertEqual(nesting_depth(sanitizer.sanitize(nested(depth), keywords={'debug'},
+                                                          keys_to_remove={'b'})), depth)
+        self.assertTrue(is_json_safe(nested(depth)))
+
+
+class MarkdownTest(unittest.TestCase):
+    RECORDS = [
+        {'id': 1, 'name': 'Ada', 'tags': ['x', None, ' ', 2, True], 'empty': [], 'meta': {'a': 1, 'b': None},
+         'blank': '  ', 'none': None, 'f': 1.5},
+        'skipped',
+        {'nested': [{'k': 'v'}], 'zero': 0, 'false': False},
+    ]
+    
+    def test_records(self):
+        self.assertEqual(
+            json_to_markdown(self.RECORDS),
+            "\n## Record 1\n\n- **id**: 1\n- **name**: Ada\n- **tags**: x, 2, True\n- **meta**:\n"
+            "  - a: 1\n  - b: None\n- **f**: 1.5\n\n\n## Record 3\n\n- **nested**: {'k': 'v'}\n"
+            "- **zero**: 0\n- **false**: False\n"
+        )
+        self.assertEqual("\n".join(markdown_records(self.RECORDS)), json_to_markdown(self.RECORDS))
+    
+    def test_single_object_and_scalars(self):
+        self.assertEqual(json_to_markdown({'title': 'T', 'list': [1, 2], 'obj': {}}),
+                         '## Record\n\n- **title**: T\n- **list**: 1, 2\n- **obj**:')
+        self.assertEqual(json_to_markdown('text'), 'text')
+        self.assertEqual(json_to_markdown(3), '3')
+    
+    @unittest.skipUnless(IJSON_AVAILABLE, "ijson is not installed")
+    def test_streamed_file_matches_loaded_file(self):
+        rng = random.Random(1)
+        records = [random_json(rng) for _ in range(200)] + [{'big': 10 ** 30, 'f': 0.1, 'e': 1e300}]
+        options = {'remove_pii': False, 'keys_to_remove': {'created', 'email'}}
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            input_file = os.path.join(tmp, 'input.json')
+            with open(input_file, 'w', encoding='utf-8') as f:
+                json.dump(records, f)
+            sanitizer = make_sanitizer()
+            loaded = list(sanitize_records(load_json_file(input_file), sanitizer, **options))
+            streamed = load_and_sanitize_stream(input_file, sanitizer, **options)
+            
+            with contextlib.redirect_stdout(io.StringIO()):
+                save_plain_text_file(loaded, os.path.join(tmp, 'loaded.md'))
+                save_plain_text_file(streamed, os.path.join(tmp, 'streamed.md'))
+            
+            with open(os.path.join(tmp, 'loaded.md'), encoding='utf-8') as f:
+                expected = f.read()
+            with open(os.path.join(tmp, 'streamed.md'), encoding='utf-8') as f:
+                self.assertEqual(f.read(), expected)
+
+
+class PreFilterTest(unittest.TestCase):
+    def test_capitalized_names_reach_ner(self):
+        sanitizer = make_sanitizer()
+        # Pretend Presidio is available so the name pre-filter applies
+        sanitizer.analyzer = sanitizer.anonymizer = object()
+        
+        for text in ('Bob', 'Émile', 'Ölaf Şahin', 'Ángel', 'meet Ζωή'):
+            self.assertTrue(sanitizer._may_contain_pii(text), text)
+        for text in ('bob', 'plain text'):
+            self.assertFalse(sanitizer._may_contain_pii(text), text)
+
+
+class SanitizeRecordsTest(unittest.TestCase):
+    def test_no_workers_without_pii_removal(self):
+        records = [{'id': i, 'email': 'a@b.com', 'note': None} for i in range(_MIN_PARALLEL_RECORDS)]
+        sanitizer = make_sanitizer()
+        
+        with mock.patch.object(json_sanitizer.multiprocessing, 'Pool', side_effect=AssertionError("pool used")):
+            result = list(sanitize_records(records, sanitizer, 2, remove_pii=False, keys_to_remove={'email'}))
+        
+        self.assertEqual(result, [{'id': i} for i in range(_MIN_PARALLEL_RECORDS)])
+
+
+class NonFiniteNumbersTest(unittest.TestCase):
+    def test_nan_array_is_sanitized(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, 'input.json'), 'w', encoding='utf-8') as f:
+                f.write('[{"a": NaN, "b": 1, "c": Infinity, "email": "x"}]')
+            
+            code, output = run_main(tmp, 'input.json')
+            
+            self.assertEqual(code, 0, output)
+            with open(os.path.join(tmp, 'input_sanitized.md'), encoding='utf-8') as f:
+                markdown = f.read()
+            self.assertEqual(markdown, "\n## Record 1\n\n- **a**: nan\n- **b**: 1\n- **c**: inf\n")
+
+
+if __name__ == '__main__':
+    unittest.main()